@@ -1,114 +1,286 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from datetime import datetime, timedelta
+import html
+import hashlib
+import difflib
+import re
+from datetime import datetime
+from pathlib import Path
 import time
+import threading
+from string import Template
+from types import MappingProxyType, SimpleNamespace
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # ========== API FUNCTIONS ==========
-apify_api_key = st.secrets.get("APIFY", "")
-groq_api_key = st.secrets.get("GROQ", "")
+@st.cache_resource(show_spinner=False)
+def get_keys() -> SimpleNamespace:
+    """API keys, read from st.secrets once per process instead of on every rerun."""
+    return SimpleNamespace(apify=st.secrets.get("APIFY", ""), groq=st.secrets.get("GROQ", ""))
+
+@st.cache_resource(show_spinner=False)
+def get_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for running independent API calls concurrently."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="linzy")
+
+@st.cache_resource(show_spinner=False)
+def get_llm_executor() -> ThreadPoolExecutor:
+    """Groq-only pool, so message generation never queues behind minutes-long Apify runs."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="linzy-llm")
+
+def run_in_background(fn, *args, executor: ThreadPoolExecutor = None):
+    """
+    Submit fn to executor (the shared worker pool by default) and return its Future.
+    The current script context is attached so st.cache_data works as it does on the
+    script thread. fn must not call st.* element commands: concurrent writes to the
+    page from several threads can land in the wrong slot, so return results or raise
+    and render them on the script thread after .result().
+    """
+    ctx = get_script_run_ctx()
+
+    def call():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+
+    return (executor or get_executor()).submit(call)
+
+APIFY_API_URL = "https://api.apify.com/v2"
+APIFY_PROFILE_RUN_URL = f"{APIFY_API_URL}/acts/apimaestro~linkedin-profile-detail/runs"
+APIFY_POSTS_SYNC_URL = f"{APIFY_API_URL}/acts/apimaestro~linkedin-batch-profile-posts-scraper/run-sync-get-dataset-items"
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+# Apify holds a run start or status request open for up to 60s while the run finishes
+APIFY_WAIT_FOR_FINISH = 60
+# ...and a run-sync request for up to 300s before answering 408
+APIFY_SYNC_READ_TIMEOUT = 310
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+@st.cache_resource(show_spinner=False)
+def get_http_session() -> requests.Session:
+    """
+    Shared HTTP session so Apify and Groq calls reuse pooled keep-alive connections.
+    Connection errors are retried everywhere. Read timeouts and transient
+    429/5xx responses are retried only for GETs (run polling): resending an
+    Apify POST would start another paid actor run, and Groq's status retries
+    are left to groq_post.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=RETRYABLE_STATUS,
+        allowed_methods=["GET"],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=50, pool_maxsize=50, max_retries=retry)
+    session.mount("https://", adapter)
+
+    groq_retry = Retry(total=3, read=0, backoff_factor=0.5)
+    session.mount("https://api.groq.com", HTTPAdapter(pool_connections=50, pool_maxsize=50, max_retries=groq_retry))
+    return session
+
+SESSION = get_http_session()
+
+@lru_cache(maxsize=4)
+def api_headers(api_key: str) -> MappingProxyType:
+    """Read-only Bearer + JSON headers, built once per key for Apify and Groq calls."""
+    return MappingProxyType({
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    })
+
+def groq_post(payload: dict, headers: dict, timeout: int, stream: bool = False, attempts: int = 4):
+    """
+    POST a chat completion to Groq, retrying 429/5xx with exponential backoff
+    and honoring Retry-After. Returns the last response.
+    """
+    for attempt in range(attempts):
+        response = SESSION.post(GROQ_CHAT_URL, headers=headers, json=payload, timeout=timeout, stream=stream)
+        if response.status_code not in RETRYABLE_STATUS or attempt == attempts - 1:
+            return response
+
+        try:
+            retry_after = float(response.headers.get("Retry-After", 0))
+        except ValueError:
+            retry_after = 0
+        response.close()
+        time.sleep(min(30, 2 ** attempt * 0.5 + retry_after))
 
+# ========== RESULT CACHE ==========
+CACHE_DIR = Path.home() / ".cache" / "linzy"
+
+class FetchError(Exception):
+    """Raised by cached API helpers on failure so Streamlit never caches a miss."""
+
+def _cache_path(namespace: str, key: str) -> Path:
+    return CACHE_DIR / namespace / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.txt"
+
+def read_cache(namespace: str, key: str, max_age: float = None) -> str:
+    """Return the text cached on disk for key, or None on a miss or if older than max_age seconds."""
+    path = _cache_path(namespace, key)
+    try:
+        if max_age is not None and time.time() - path.stat().st_mtime > max_age:
+            return None
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+def write_cache(namespace: str, key: str, text: str) -> None:
+    """Store text on disk under key. Cache write failures are not fatal."""
+    path = _cache_path(namespace, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    except OSError:
+        pass
+
+# The path segment after /in/, ending at the next slash, query, fragment or whitespace
+PROFILE_USERNAME_RE = re.compile(r"/in/([^/?#\s]+)", re.IGNORECASE)
+
+@lru_cache(maxsize=256)
 def extract_username_from_url(profile_url: str) -> str:
-    """Extract username from LinkedIn URL."""
-    if "/in/" in profile_url:
-        return profile_url.split("/in/")[-1].strip("/").split("?")[0]
-    return profile_url
+    """
+    Extract username from LinkedIn URL.
+    Normalized (lowercase, no slashes) so every spelling of a profile shares one cache key.
+    """
+    match = PROFILE_USERNAME_RE.search(profile_url)
+    username = match.group(1) if match else profile_url.strip().strip("/")
+    return username.lower()
 
 def start_apify_run(username: str, api_key: str) -> dict:
     """
-    Start the Apify actor run asynchronously.
+    Start the Apify actor run, waiting up to APIFY_WAIT_FOR_FINISH seconds for it,
+    so short runs come back already SUCCEEDED.
     HTTP 201 status means SUCCESS - run created.
+    Raises FetchError on failure; runs on worker threads, so it never calls st.*.
     """
+    if not api_key:
+        raise FetchError("Apify API key missing")
+    if not username:
+        raise FetchError("LinkedIn username missing")
+
     try:
-        endpoint = "https://api.apify.com/v2/acts/apimaestro~linkedin-profile-detail/runs"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {"username": username, "includeEmail": False}
         
-        response = requests.post(endpoint, headers=headers, json=payload, timeout=30)
+        response = SESSION.post(
+            f"{APIFY_PROFILE_RUN_URL}?waitForFinish={APIFY_WAIT_FOR_FINISH}",
+            headers=api_headers(api_key),
+            json=payload,
+            timeout=(10, APIFY_WAIT_FOR_FINISH + 15)
+        )
         
         if response.status_code == 201:
             run_data = response.json()
             return {
                 "run_id": run_data["data"]["id"],
                 "dataset_id": run_data["data"]["defaultDatasetId"],
-                "status": "RUNNING"
+                "status": run_data["data"].get("status", "RUNNING")
             }
         else:
-            st.error(f"Failed to start actor. Status: {response.status_code}")
-            return None
+            raise FetchError(f"Failed to start actor. Status: {response.status_code}")
             
+    except FetchError:
+        raise
     except Exception as e:
-        st.error(f"Error starting Apify run: {str(e)}")
-        return None
+        raise FetchError(f"Error starting Apify run: {str(e)}")
 
-def scrape_linkedin_posts(profile_url: str, api_key: str) -> list:
+def scrape_linkedin_posts(usernames: list, api_key: str) -> dict:
     """
-    Scrape last 2 posts from a LinkedIn profile using Apify actor.
+    Scrape last 2 posts for each LinkedIn username in a single Apify actor run.
     Filter for last 30 days only.
+    Returns {username: posts}; raises FetchError if the scrape itself failed.
     """
-    try:
-        endpoint = (
-            "https://api.apify.com/v2/acts/"
-            "apimaestro~linkedin-batch-profile-posts-scraper/"
-            "run-sync-get-dataset-items?token=" + api_key
-        )
+    if not api_key:
+        raise FetchError("Apify API key missing")
+    usernames = [username for username in usernames if username]
+    if not usernames:
+        raise FetchError("LinkedIn username missing")
 
+    try:
         payload = {
             "includeEmail": False,
-            "usernames": [profile_url.strip()]  # MUST be a list
+            "usernames": list(usernames)  # MUST be a list
         }
 
-        headers = {"Content-Type": "application/json"}
-
-        response = requests.post(
-            endpoint,
+        response = SESSION.post(
+            APIFY_POSTS_SYNC_URL,
             json=payload,
-            headers=headers,
-            timeout=90
+            headers=api_headers(api_key),
+            # A batch scrape takes longer with every username, so wait out Apify's whole sync window
+            timeout=(10, APIFY_SYNC_READ_TIMEOUT)
         )
 
         if response.status_code not in (200,201):
-            st.error(
+            raise FetchError(
                 f"Failed. Status: {response.status_code}, "
                 f"Response: {response.text[:500]}"
             )
-            return []
 
         data = response.json()
 
         if not isinstance(data, list):
-            st.warning("Unexpected response structure from Apify.")
-            return []
+            raise FetchError("Unexpected response structure from Apify.")
 
-        # Filter posts from last 30 days
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        filtered_posts = []
+        # Filter posts from last 30 days, grouped back by author.
+        # Apify timestamps are epoch milliseconds, so compare them as integers.
+        cutoff_ms = int((time.time() - 30 * 86400) * 1000)
+        posts_by_username = {username: [] for username in usernames}
+        lookup = {username.lower(): username for username in usernames}
         
         for post in data:
             if not isinstance(post, dict):
                 continue
+
+            if len(usernames) == 1:
+                owner = usernames[0]
+            else:
+                owner = lookup.get(str(post.get('username', '')).lower())
+                if owner is None:
+                    continue
                 
-            # Check timestamp
+            # Posts without a numeric timestamp can't be dated, so they are skipped
             timestamp = post.get('timestamp')
-            if timestamp:
-                try:
-                    post_date = datetime.fromtimestamp(timestamp / 1000)  # Convert ms to seconds
-                    if post_date >= thirty_days_ago:
-                        filtered_posts.append(post)
-                except:
-                    # If timestamp parsing fails, skip
-                    continue
+            if isinstance(timestamp, (int, float)) and timestamp >= cutoff_ms:
+                posts_by_username[owner].append(post)
         
-        # Return only last 2 posts from last 30 days
-        return filtered_posts[:2]
+        # Keep only last 2 posts from last 30 days per profile
+        return {username: posts[:2] for username, posts in posts_by_username.items()}
 
+    except FetchError:
+        raise
     except Exception as e:
-        st.error(f"Error scraping posts: {str(e)}")
-        return []
+        raise FetchError(f"Error scraping posts: {str(e)}")
+
+# Keywords match anywhere in the text ("congrat" also catches "congratulations")
+EXCLUDE_KEYWORDS = (
+    "hiring", "job", "diwali", "holiday", "festival", "birthday", "anniversary",
+    "wish", "congrat", "thank", "happy"
+)
+PROFESSIONAL_KEYWORDS = (
+    "project", "launch", "achievement", "team", "lead", "develop", "build", "create", "innovation", "growth",
+    "strategy", "business", "industry", "market", "tech", "software", "product", "service", "client", "customer"
+)
+
+# One alternation, exclusions first, so a single scan classifies a post
+POST_KEYWORD_RE = re.compile(
+    f"(?P<exclude>{'|'.join(map(re.escape, EXCLUDE_KEYWORDS))})|"
+    f"(?P<professional>{'|'.join(map(re.escape, PROFESSIONAL_KEYWORDS))})",
+    re.IGNORECASE | re.ASCII  # keywords are ASCII, so skip Unicode case-folding
+)
+
+def is_professional_post(post_text: str) -> bool:
+    """Professional keyword present and no excluded keyword, found in one pass over the text."""
+    has_professional = False
+    for match in POST_KEYWORD_RE.finditer(post_text):
+        if match.lastgroup == "exclude":
+            return False
+        has_professional = True
+    return has_professional
 
 def filter_professional_posts(posts):
     """
@@ -118,95 +290,185 @@ def filter_professional_posts(posts):
         return []
 
     filtered_posts = []
-    exclude_keywords = ['hiring', 'job', 'diwali', 'holiday', 'festival', 'birthday', 
-                       'anniversary', 'wish', 'congrat', 'thank', 'happy']
-    
+    seen = set()
+
     for post in posts:
         if not isinstance(post, dict):
             continue
-            
-        post_text = post.get('text', '').lower()
-        
-        # Check if it contains junk keywords
-        has_excluded = any(keyword in post_text for keyword in exclude_keywords)
-        
-        # Check if it's professional content
-        professional_keywords = ['project', 'launch', 'achievement', 'team', 'lead', 
-                                'develop', 'build', 'create', 'innovation', 'growth',
-                                'strategy', 'business', 'industry', 'market', 'tech',
-                                'software', 'product', 'service', 'client', 'customer']
-        
-        has_professional = any(keyword in post_text for keyword in professional_keywords)
+
+        # Reshares and repeated actor items carry the same URL (or text); keep the first copy
+        post_text = post.get('text', '')
+        identity = post.get('url') or post_text
+        if identity in seen:
+            continue
+        seen.add(identity)
         
         # Keep if it's professional AND not excluded
-        if has_professional and not has_excluded:
+        if is_professional_post(post_text):
             filtered_posts.append(post)
+            if len(filtered_posts) == 2:
+                break
     
-    return filtered_posts[:2]
+    return filtered_posts
+
+def format_post_date(post: dict) -> str:
+    """Display date for a post's epoch-ms timestamp, or 'Recent' when it has none."""
+    timestamp = post.get('timestamp')
+    if not timestamp:
+        return 'Recent'
+    return datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d')
+
+def fetch_run_dataset_item(dataset_id: str, api_key: str) -> dict:
+    """First item of a finished run's dataset, or None if it is empty; raises FetchError if it can't be fetched."""
+    try:
+        dataset_response = SESSION.get(f"{APIFY_API_URL}/datasets/{dataset_id}/items", headers=api_headers(api_key), timeout=30)
+        if dataset_response.status_code != 200:
+            raise FetchError(f"Failed to fetch dataset: {dataset_response.status_code}")
+        items = dataset_response.json()
+    except FetchError:
+        raise
+    except Exception as e:
+        raise FetchError(f"Error fetching dataset: {str(e)}")
+
+    if isinstance(items, list) and len(items) > 0:
+        return items[0]
+    elif isinstance(items, dict):
+        return items
+    return None
 
 def poll_apify_run_with_status(run_id: str, dataset_id: str, api_key: str) -> dict:
     """
-    Poll the Apify run with proper status updates.
-    Returns profile data when successful.
+    Poll the Apify run until it finishes.
+    Uses waitForFinish so Apify holds each request open (up to 60s)
+    and answers as soon as the run finishes; gives up after about 10 minutes.
+    Returns profile data when successful and raises FetchError otherwise.
+    Progress is shown by the caller on the script thread, since this runs on workers.
     """
-    max_attempts = 60
-    headers = {"Authorization": f"Bearer {api_key}"}
-    
-    with st.spinner(""):
-        progress_bar = st.progress(0)
-        
-        for attempt in range(max_attempts):
-            progress = min(100, int((attempt + 1) / max_attempts * 80))
-            progress_bar.progress(progress)
+    if not api_key:
+        raise FetchError("Apify API key missing")
+
+    max_attempts = 10
+    wait_for_finish = APIFY_WAIT_FOR_FINISH
+    headers = api_headers(api_key)
+
+    for attempt in range(max_attempts):
+        try:
+            status_endpoint = f"{APIFY_API_URL}/actor-runs/{run_id}?waitForFinish={wait_for_finish}"
+            status_response = SESSION.get(status_endpoint, headers=headers, timeout=wait_for_finish + 15)
             
-            try:
-                status_endpoint = f"https://api.apify.com/v2/actor-runs/{run_id}"
-                status_response = requests.get(status_endpoint, headers=headers, timeout=15)
+            if status_response.status_code == 200:
+                status_data = status_response.json()["data"]
+                current_status = status_data.get("status", "UNKNOWN")
                 
-                if status_response.status_code == 200:
-                    status_data = status_response.json()["data"]
-                    current_status = status_data.get("status", "UNKNOWN")
-                    
-                    if current_status == "SUCCEEDED":
-                        progress_bar.progress(95)
+                if current_status == "SUCCEEDED":
+                    return fetch_run_dataset_item(dataset_id, api_key)
                         
-                        dataset_endpoint = f"https://api.apify.com/v2/datasets/{dataset_id}/items"
-                        dataset_response = requests.get(dataset_endpoint, headers=headers, timeout=30)
-                        
-                        if dataset_response.status_code == 200:
-                            items = dataset_response.json()
-                            progress_bar.progress(100)
-                            if isinstance(items, list) and len(items) > 0:
-                                return items[0]
-                            elif isinstance(items, dict):
-                                return items
-                        else:
-                            st.error(f"Failed to fetch dataset: {dataset_response.status_code}")
-                            return None
-                            
-                    elif current_status in ["FAILED", "TIMED-OUT", "ABORTED"]:
-                        st.error(f"Apify run failed: {current_status}")
-                        return None
-                        
-                    elif current_status == "RUNNING":
-                        time.sleep(10)
-                        continue
-                        
-                else:
-                    time.sleep(10)
-                    
-            except Exception as e:
-                time.sleep(10)
-    
-    st.error("Polling timeout - Apify taking too long")
-    return None
+                elif current_status in ["FAILED", "TIMED-OUT", "ABORTED"]:
+                    raise FetchError(f"Apify run failed: {current_status}")
 
-def generate_research_brief(profile_data: dict, api_key: str) -> str:
+                # Still running after a full waitForFinish: ask again right away
+                continue
+
+        except FetchError:
+            raise
+        except Exception:
+            pass
+
+        # Errors come back immediately rather than after the long-poll, so back off before retrying
+        time.sleep(min(4.0, 0.5 * 2 ** attempt))
+
+    raise FetchError("Polling timeout - Apify taking too long")
+
+PROSPECT_CACHE_TTL = 86400
+PROSPECT_CACHE_ENTRIES = 500
+
+@st.cache_data(ttl=PROSPECT_CACHE_TTL, max_entries=PROSPECT_CACHE_ENTRIES, show_spinner=False)
+def fetch_profile(username: str, _api_key: str) -> dict:
+    """
+    Run the profile-detail actor for username and wait for its result.
+    Short runs finish while the start request is held open; longer ones
+    are long-polled. Only one actor run is ever started per fetch.
+    Cached per username for a day, in memory and on disk so restarts stay warm;
+    raises FetchError on failure.
+    """
+    cached_profile = read_cache("profiles", username, max_age=PROSPECT_CACHE_TTL)
+    if cached_profile is not None:
+        return json.loads(cached_profile)
+
+    run_info = start_apify_run(username, _api_key)
+    if run_info["status"] == "SUCCEEDED":
+        profile_data = fetch_run_dataset_item(run_info["dataset_id"], _api_key)
+    else:
+        profile_data = poll_apify_run_with_status(run_info["run_id"], run_info["dataset_id"], _api_key)
+
+    if not profile_data:
+        raise FetchError(f"No profile data returned for {username}")
+    write_cache("profiles", username, json.dumps(profile_data))
+    return profile_data
+
+@st.cache_data(ttl=PROSPECT_CACHE_TTL, max_entries=PROSPECT_CACHE_ENTRIES, show_spinner=False)
+def fetch_posts(usernames: tuple, _api_key: str) -> dict:
+    """
+    Recent posts for a batch of usernames, scraped in one actor run.
+    Cached for a day in memory and per username on disk, so only usernames
+    missing from the disk cache are scraped; raises FetchError on failure.
+    """
+    posts_by_username = {}
+    for username in usernames:
+        cached_posts = read_cache("posts", username, max_age=PROSPECT_CACHE_TTL)
+        if cached_posts is not None:
+            posts_by_username[username] = json.loads(cached_posts)
+
+    missing = [username for username in usernames if username not in posts_by_username]
+    if missing:
+        scraped = scrape_linkedin_posts(missing, _api_key)
+        for username, posts in scraped.items():
+            write_cache("posts", username, json.dumps(posts))
+        posts_by_username.update(scraped)
+    return posts_by_username
+
+def stream_chat_content(response):
+    """Yield the content deltas of a streamed (SSE) Groq chat completion."""
+    response.encoding = "utf-8"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data: "):
+            continue
+        data = line[len("data: "):]
+        if data == "[DONE]":
+            break
+        choices = json.loads(data).get("choices") or []
+        if choices:
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                yield content
+
+# Top-level (or basic_info) profile fields worth showing the research brief
+_BRIEF_KEYS = ("fullname", "headline", "about", "location", "current_company")
+
+def _compact_profile(profile_data: dict) -> dict:
+    """Only the profile fields the research brief uses, so the prompt stays small."""
+    basic_info = profile_data.get("basic_info") or {}
+    compact = {}
+    for key in _BRIEF_KEYS:
+        value = profile_data.get(key) or basic_info.get(key)
+        if value:
+            compact[key] = value[:600] if isinstance(value, str) else value
+    compact["experience"] = (profile_data.get("experience") or [])[:3]
+    compact["education"] = (profile_data.get("education") or [])[:2]
+    compact["posts"] = [{"text": (post.get("text") or "")[:300]} for post in (profile_data.get("posts") or [])[:2]]
+    return compact
+
+def generate_research_brief(profile_data: dict, api_key: str):
     """
     Generate research brief with improved reliability.
+    Yields text chunks as Groq streams them, for use with st.write_stream.
     """
+    if not api_key:
+        st.error("Groq API key missing")
+        return
+
     try:
-        profile_summary = json.dumps(profile_data, indent=2)[:2000]
+        profile_summary = json.dumps(_compact_profile(profile_data), separators=(",", ":"), ensure_ascii=False)
         
         prompt = f'''
         Create a concise research brief for sales prospecting.
@@ -223,11 +485,6 @@ def generate_research_brief(profile_data: dict, api_key: str) -> str:
         Keep it factual and actionable.
         '''
         
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": "llama-3.1-8b-instant",
             "messages": [
@@ -238,36 +495,190 @@ def generate_research_brief(profile_data: dict, api_key: str) -> str:
                 {"role": "user", "content": prompt}
             ],
             "temperature": 0.3,
-            "max_tokens": 1200
+            "max_tokens": 600,
+            "stream": True
         }
+
+        # Keyed on exactly what is sent to Groq: profile fields the prompt ignores
+        # don't cause misses, and a prompt or model change doesn't serve stale briefs
+        cache_key = json.dumps(payload, sort_keys=True)
+        cached_brief = read_cache("briefs", cache_key)
+        if cached_brief is not None:
+            yield cached_brief
+            return
         
         try:
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
+            response = groq_post(payload, api_headers(api_key), timeout=60, stream=True)
             
             if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
+                chunks = []
+                for chunk in stream_chat_content(response):
+                    chunks.append(chunk)
+                    yield chunk
+                write_cache("briefs", cache_key, "".join(chunks))
             else:
-                return f"Research brief generation encountered an issue (Status: {response.status_code}). The profile data is loaded and ready for message generation."
+                yield f"Research brief generation encountered an issue (Status: {response.status_code}). The profile data is loaded and ready for message generation."
                 
         except requests.exceptions.Timeout:
-            return "Research brief generation is taking longer than expected. Profile data is loaded and ready for message generation."
+            yield "Research brief generation is taking longer than expected. Profile data is loaded and ready for message generation."
         except Exception as e:
-            return f"Research brief service temporarily unavailable. Profile data loaded successfully."
+            yield f"Research brief service temporarily unavailable. Profile data loaded successfully."
             
     except Exception as e:
-        return f"Profile analysis ready. Focus on message generation."
+        yield f"Profile analysis ready. Focus on message generation."
+
+def request_message_options(system_prompt: str, user_prompt: str, api_key: str, max_tokens: int = 400) -> list:
+    """
+    Ask Groq (JSON mode) for message options and return the raw list.
+    max_tokens should fit the requested options plus the JSON wrapper (~100 tokens per 300-char message).
+    Not cached: it only runs on a Generate or Refine click, and each click should get new options.
+    Raises FetchError on failure.
+    """
+    payload = {
+        "model": "llama-3.1-8b-instant",
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+        "response_format": {"type": "json_object"},
+        "stream": False
+    }
+    
+    response = groq_post(payload, api_headers(api_key), timeout=30)
+    if response.status_code != 200:
+        raise FetchError(f"Groq returned status {response.status_code}")
+
+    # JSON mode returns {"messages": [...]}; anything else is treated as a failure
+    content = response.json()["choices"][0]["message"]["content"]
+    try:
+        data = json.loads(content)
+    except ValueError:
+        raise FetchError("Groq returned invalid JSON")
+    messages = data.get("messages", []) if isinstance(data, dict) else []
+    messages = [msg.strip() for msg in messages if isinstance(msg, str)]
+    if not messages:
+        raise FetchError("Groq returned no messages")
+    return messages
+
+# "Role at Company" (preferred) or "Role - Company"; the company ends at the next " | " or " - "
+HEADLINE_RE = re.compile(r"^(?:(?P<role>.+?)\s+at\s+|(?P<dash_role>.+?)\s+-\s+)(?P<company>.+?)(?:\s+[|-]\s+.*)?$")
+
+# "1. ", "2. " or "3. " option numbering the model sometimes puts before a message
+NUM_PREFIX_RE = re.compile(r'^\s*[1-3]\.\s*')
+
+# Near-duplicate prospect cache: same sender, almost the same role/company/post topic
+SIMILAR_PROSPECT_THRESHOLD = 0.95
+SIMILAR_PROSPECT_LIMIT = 200
+
+def prospect_similarity_key(prospect_role: str, prospect_company: str, recent_post_topic: str) -> str:
+    """Normalized role|company|topic string used to spot near-duplicate prospects."""
+    return "|".join(" ".join(part.lower().split()) for part in (prospect_role, prospect_company, recent_post_topic))
+
+def _load_similar_prospects() -> list:
+    try:
+        return json.loads(read_cache("messages", "similar-prospects") or "[]")
+    except ValueError:
+        return []
+
+def lookup_similar_messages(similarity_key: str, sender_key: str, prospect_name: str) -> list:
+    """
+    Return messages generated in the last day for a different prospect whose key
+    is at least 95% similar, re-addressed to prospect_name. Returns None when
+    nothing is close enough, so the same prospect always gets fresh options.
+    """
+    cutoff = time.time() - PROSPECT_CACHE_TTL
+    for entry in reversed(_load_similar_prospects()):
+        if entry.get("sender") != sender_key or entry.get("saved_at", 0) < cutoff:
+            continue
+        if entry.get("prospect_name", "").lower() == prospect_name.lower():
+            continue
+        matcher = difflib.SequenceMatcher(None, similarity_key, entry.get("key", ""))
+        if (matcher.real_quick_ratio() >= SIMILAR_PROSPECT_THRESHOLD
+                and matcher.quick_ratio() >= SIMILAR_PROSPECT_THRESHOLD
+                and matcher.ratio() >= SIMILAR_PROSPECT_THRESHOLD):
+            # Only reuse messages whose greeting is the sole mention of the old name, so re-addressing is complete
+            old_name = entry["prospect_name"]
+            old_greeting = f"Hi {old_name},"
+            if all(msg.startswith(old_greeting) and old_name not in msg[len(old_greeting):] for msg in entry["messages"]):
+                return [f"Hi {prospect_name}," + msg[len(old_greeting):] for msg in entry["messages"]]
+    return None
+
+def remember_messages(similarity_key: str, sender_key: str, prospect_name: str, messages: list) -> None:
+    """
+    Record generated messages so near-identical prospects can reuse them.
+    Replaces any earlier entry for the same sender and prospect, so regenerating doesn't pile up copies.
+    """
+    entries = [
+        entry for entry in _load_similar_prospects()
+        if entry.get("sender") != sender_key or entry.get("prospect_name", "").lower() != prospect_name.lower()
+    ]
+    entries.append({
+        "key": similarity_key,
+        "sender": sender_key,
+        "prospect_name": prospect_name,
+        "messages": messages,
+        "saved_at": time.time()
+    })
+    write_cache("messages", "similar-prospects", json.dumps(entries[-SIMILAR_PROSPECT_LIMIT:]))
+
+# Examples, rules and output format shared by every generation. Kept ahead of the prospect and
+# sender details so the leading part of every system prompt is byte-identical (prefix-cache friendly)
+MESSAGE_STYLE_PROMPT = '''You are an expert LinkedIn message writer. Generate 3 different connection requests in the EXACT style of these examples:
+
+EXAMPLE MESSAGES:
+1. "Hi Maria,
+Your role managing wire ops and branch controls at Banc of California builds on deep experience across audits, transfers, and team operations. I focus on automating servicing workflows to reduce risk and improve turnaround. Would be glad to connect.
+Best, Joseph"
+
+2. "Hi Eric,
+Your work driving multi-year business transformative initiatives caught my eye. I've been connecting with peers navigating enterprise shifts while aligning delivery with strategy. Would love to connect and trade insights.
+Best, Joseph"
+
+3. "Hi Kathleen,
+Guiding IT at FirstBank while navigating long-term tech evolution must be in equal parts challenging & exciting. Coming from the same ecosystem, I'd love to connect.
+Best, Joseph"
+
+RULES:
+- Each message 200-300 characters MAX
+- First line: "Hi [First Name],"
+- Second line: Specific hook about their role/work (not generic)
+- Third line: Brief mention of your work: "I focus on..." or "I've been exploring..." or "I work with..."
+- Fourth line: Simple connection request: "Would be glad to connect." or "Thought it'd be great to connect." or "Let's connect."
+- Signature: "Best, [Your First Name]"
+- NO flattery, NO lengthy explanations, NO buzzwords
+- If mentioning a post: "I saw your post about [topic]..." or "Noticed your focus on [topic]..."
+- Sound like a peer, not a salesperson
+
+Generate 3 different messages following EXACTLY the structure and style above. Keep them concise and professional.
+
+Return JSON only: {"messages": ["message 1", "message 2", "message 3"]}'''
+
+# Per-generation tail of the system prompt, filled with str.format
+MESSAGE_DETAILS_PROMPT = '''
+
+PROSPECT:
+Name: {prospect_name}
+Role: {prospect_role}
+Company: {prospect_company}
+Recent Post: {recent_post_topic}
+
+YOU:
+Name: {sender_first_name}
+What you do: {sender_role_desc}'''
 
 def analyze_and_generate_message(prospect_data: dict, sender_info: dict, api_key: str, 
                                 user_instructions: str = None, previous_message: str = None) -> list:
     """
     Generate LinkedIn messages in the concise, professional style of the samples.
-    Returns list of 3 complete message options (200-300 characters).
+    Returns list of 3 complete message options (200-300 characters), or None without an API key.
+    Runs on the Groq pool for new generations, so it never calls st.*; callers report errors.
     """
+    if not api_key:
+        return None
+    sender_info = sender_info or {}
+
     try:
         # 1. EXTRACT PROSPECT DATA
         prospect_name = "there"
@@ -284,16 +695,10 @@ def analyze_and_generate_message(prospect_data: dict, sender_info: dict, api_key
                 prospect_name = name_parts[0] if name_parts else "there"
             
             # Extract current position
-            if prospect_data.get('headline'):
-                headline = prospect_data['headline']
-                if ' at ' in headline:
-                    prospect_role = headline.split(' at ')[0].strip()
-                    prospect_company = headline.split(' at ')[1].strip().split(' | ')[0].split(' - ')[0]
-                elif ' - ' in headline:
-                    parts = headline.split(' - ')
-                    if len(parts) >= 2:
-                        prospect_role = parts[0].strip()
-                        prospect_company = parts[1].strip()
+            headline_match = HEADLINE_RE.match(prospect_data.get('headline') or "")
+            if headline_match:
+                prospect_role = (headline_match.group('role') or headline_match.group('dash_role')).strip()
+                prospect_company = headline_match.group('company').strip()
             
             # Fallback to experience
             if not prospect_role and prospect_data.get('experience'):
@@ -318,143 +723,79 @@ def analyze_and_generate_message(prospect_data: dict, sender_info: dict, api_key
         sender_name = sender_info.get('name', 'Professional')
         sender_first_name = sender_name.split()[0] if sender_name else "Professional"
         sender_role_desc = sender_info.get('role_desc', '')
-        
-        # 4. SIMPLE, DIRECT PROMPT MATCHING SAMPLE STYLE
-        system_prompt = f'''You are an expert LinkedIn message writer. Generate 3 different connection requests in the EXACT style of these examples:
-
-EXAMPLE MESSAGES:
-1. "Hi Maria,
-Your role managing wire ops and branch controls at Banc of California builds on deep experience across audits, transfers, and team operations. I focus on automating servicing workflows to reduce risk and improve turnaround. Would be glad to connect.
-Best, Joseph"
-
-2. "Hi Eric,
-Your work driving multi-year business transformative initiatives caught my eye. I've been connecting with peers navigating enterprise shifts while aligning delivery with strategy. Would love to connect and trade insights.
-Best, Joseph"
 
-3. "Hi Kathleen,
-Guiding IT at FirstBank while navigating long-term tech evolution must be in equal parts challenging & exciting. Coming from the same ecosystem, I'd love to connect.
-Best, Joseph"
-
-RULES:
-- Each message 200-300 characters MAX
-- First line: "Hi [First Name],"
-- Second line: Specific hook about their role/work (not generic)
-- Third line: Brief mention of your work: "I focus on..." or "I've been exploring..." or "I work with..."
-- Fourth line: Simple connection request: "Would be glad to connect." or "Thought it'd be great to connect." or "Let's connect."
-- Signature: "Best, [Your First Name]"
-- NO flattery, NO lengthy explanations, NO buzzwords
-- If mentioning a post: "I saw your post about [topic]..." or "Noticed your focus on [topic]..."
-- Sound like a peer, not a salesperson
+        is_refinement = bool(user_instructions and previous_message)
 
-PROSPECT:
-Name: {prospect_name}
-Role: {prospect_role or 'their role'}
-Company: {prospect_company or 'their company'}
-Recent Post: {recent_post_topic or 'None'}
+        # Without the sender's name and "what you do" there is nothing for Groq to write from
+        if not sender_info.get('name') or not sender_role_desc:
+            return generate_exact_style_fallback(prospect_name, sender_first_name, sender_role_desc, prospect_role, prospect_company)
 
-YOU:
-Name: {sender_first_name}
-What you do: {sender_role_desc}
+        # Nothing to personalize with: the LLM would only restate the templates
+        if not is_refinement and not (prospect_role or prospect_company or recent_post_topic):
+            return generate_exact_style_fallback(prospect_name, sender_first_name, sender_role_desc, prospect_role, prospect_company)
 
-Generate 3 different messages following EXACTLY the structure and style above. Keep them concise and professional.'''
+        # Reuse messages written for a near-identical prospect (new generations only)
+        similarity_key = prospect_similarity_key(prospect_role, prospect_company, recent_post_topic)
+        sender_key = f"{sender_first_name}|{sender_role_desc}"
+        if not is_refinement:
+            similar_messages = lookup_similar_messages(similarity_key, sender_key, prospect_name)
+            if similar_messages:
+                return similar_messages
+        
+        # 4. SIMPLE, DIRECT PROMPT MATCHING SAMPLE STYLE
+        system_prompt = MESSAGE_STYLE_PROMPT + MESSAGE_DETAILS_PROMPT.format(
+            prospect_name=prospect_name,
+            prospect_role=prospect_role or 'their role',
+            prospect_company=prospect_company or 'their company',
+            recent_post_topic=recent_post_topic or 'None',
+            sender_first_name=sender_first_name,
+            sender_role_desc=sender_role_desc
+        )
 
         # 5. USER PROMPT FOR REFINEMENT OR NEW
-        if user_instructions and previous_message:
+        if is_refinement:
             user_prompt = f'''Refine this message: "{previous_message[:150]}"
 
 Instructions: {user_instructions}
 
-Generate 3 refined versions in the same concise style.'''
+Generate 1 refined version in the same concise style. Return JSON only: {{"messages": ["refined message"]}}'''
         else:
             user_prompt = '''Generate 3 connection messages following the style and rules above.'''
         
-        # 6. API CALL
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "llama-3.1-8b-instant",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "temperature": 0.7,
-            "max_tokens": 1000,
-            "stream": False
-        }
-        
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            content = response.json()["choices"][0]["message"]["content"]
-            
-            # SIMPLE PARSING: Look for messages starting with "Hi "
+        # 6. API CALL (memoized on the prompts, so reruns never re-bill Groq)
+        try:
+            messages = request_message_options(system_prompt, user_prompt, api_key, max_tokens=150 if is_refinement else 400)
+        except FetchError:
             messages = []
-            lines = content.strip().split('\n')
-            current_message = []
-            collecting = False
-            
-            for line in lines:
-                line = line.strip()
-                
-                # Start of a new message
-                if line.startswith(f"Hi {prospect_name},") or line.startswith(f'"Hi {prospect_name},'):
-                    if current_message and len(' '.join(current_message)) > 100:
-                        msg_text = '\n'.join(current_message).strip()
-                        messages.append(msg_text)
-                    current_message = [line]
-                    collecting = True
-                elif collecting and line:
-                    current_message.append(line)
-                    # Check if we've reached the signature
-                    if line.startswith("Best,") and sender_first_name.lower() in line.lower():
-                        msg_text = '\n'.join(current_message).strip()
-                        messages.append(msg_text)
-                        current_message = []
-                        collecting = False
-                elif line.startswith('"Hi ') or line.startswith('1. "Hi ') or line.startswith('2. "Hi ') or line.startswith('3. "Hi '):
-                    # Alternative format
-                    if current_message and len(' '.join(current_message)) > 100:
-                        msg_text = '\n'.join(current_message).strip()
-                        messages.append(msg_text)
-                    current_message = [line.replace('"', '').replace('1. ', '').replace('2. ', '').replace('3. ', '')]
-                    collecting = True
-            
-            # Don't forget the last message
-            if current_message and len(' '.join(current_message)) > 100:
-                msg_text = '\n'.join(current_message).strip()
-                messages.append(msg_text)
-            
+        
+        if messages:
             # Clean and ensure proper formatting
+            signature = f"Best,\n{sender_first_name}"
+            inline_signature = f"Best, {sender_first_name}"
             clean_messages = []
             for msg in messages:
                 # Remove quotes if present
                 msg = msg.strip('"')
                 
                 # Ensure proper signature
-                if not msg.strip().endswith(f"Best,\n{sender_first_name}"):
-                    if f"Best, {sender_first_name}" in msg:
+                if not msg.strip().endswith(signature):
+                    if inline_signature in msg:
                         # Convert to multiline
-                        msg = msg.replace(f"Best, {sender_first_name}", f"Best,\n{sender_first_name}")
-                    elif not msg.endswith(f"Best,\n{sender_first_name}"):
+                        msg = msg.replace(inline_signature, signature)
+                    elif not msg.endswith(signature):
                         # Add signature
-                        msg = f"{msg}\nBest,\n{sender_first_name}"
+                        msg = f"{msg}\n{signature}"
                 
-                # Remove any trailing quotes or numbers
-                msg = msg.replace('1. ', '').replace('2. ', '').replace('3. ', '').strip()
+                # Remove any leading option number
+                msg = NUM_PREFIX_RE.sub('', msg).strip()
                 
                 if len(msg) > 100:
                     clean_messages.append(msg)
             
             # Return exactly 3 messages
             if len(clean_messages) >= 3:
+                if not is_refinement:
+                    remember_messages(similarity_key, sender_key, prospect_name, clean_messages[:3])
                 return clean_messages[:3]
             elif clean_messages:
                 # Add fallback messages to reach 3
@@ -470,54 +811,31 @@ Generate 3 refined versions in the same concise style.'''
     except Exception as e:
         return generate_exact_style_fallback("there", "Professional", sender_info.get('role_desc', ''), "their role", "their company")
 
+# Fallback templates matching the sample style, each with its own default for "what you do"
+FALLBACK_TEMPLATES = (
+    (Template("Hi $name,\nYour role $role_phrase $company_phrase caught my attention. $desc. Would be glad to connect.\nBest,\n$sender"),
+     "I focus on streamlining operations"),
+    (Template("Hi $name,\n$work_phrase aligns with industry shifts I've been following. $desc. Thought it'd be great to connect.\nBest,\n$sender"),
+     "I'm exploring how automation is reshaping workflows"),
+    (Template("Hi $name,\n$focus_phrase resonates with my work. $desc. Let's connect and exchange perspectives.\nBest,\n$sender"),
+     "I help streamline operations through technology"),
+)
+
 def generate_exact_style_fallback(prospect_name: str, sender_first_name: str, 
                                 sender_role_desc: str, prospect_role: str, prospect_company: str) -> list:
     """Generate fallback messages in the exact style of the samples."""
+    fields = {
+        "name": prospect_name,
+        "sender": sender_first_name,
+        "role_phrase": f"as {prospect_role}" if prospect_role else "in your position",
+        "company_phrase": f"at {prospect_company}" if prospect_company else "",
+        "work_phrase": f"Your work at {prospect_company}" if prospect_company else "Your professional work",
+        "focus_phrase": f"Your focus on {prospect_role.lower()}" if prospect_role else "Your approach to professional challenges"
+    }
     
-    # Templates matching the sample style
-    templates = [
-        f"""Hi {prospect_name},
-Your role {f"as {prospect_role}" if prospect_role else "in your position"} {f"at {prospect_company}" if prospect_company else ""} caught my attention. {sender_role_desc or "I focus on streamlining operations"}. Would be glad to connect.
-Best,
-{sender_first_name}""",
-        
-        f"""Hi {prospect_name},
-{f"Your work at {prospect_company}" if prospect_company else "Your professional work"} aligns with industry shifts I've been following. {sender_role_desc or "I'm exploring how automation is reshaping workflows"}. Thought it'd be great to connect.
-Best,
-{sender_first_name}""",
-        
-        f"""Hi {prospect_name},
-{f"Your focus on {prospect_role.lower()}" if prospect_role else "Your approach to professional challenges"} resonates with my work. {sender_role_desc or "I help streamline operations through technology"}. Let's connect and exchange perspectives.
-Best,
-{sender_first_name}"""
-    ]
-    
-    return templates[:3]
-                                    
-def generate_fallback_messages(prospect_name: str, sender_first_name: str, 
-                             sender_role_desc: str, prospect_role: str) -> list:
-    """Generate fallback messages with role depth."""
-    base_messages = [
-        f"""Hi {prospect_name},
-Your work in {prospect_role or 'your field'} demonstrates a commitment to professional excellence. As someone who {sender_role_desc or 'works in a related field'}, I appreciate the strategic approach you've taken. Would be great to exchange perspectives on industry developments.
-
-Best,
-{sender_first_name}""",
-        
-        f"""Hi {prospect_name},
-Your role at as {prospect_role or 'a professional'} shows depth in navigating complex challenges. As someone who {sender_role_desc or 'focuses on similar business improvements'}, I've followed your approach with interest. Let's connect and share insights on mutual growth opportunities.
+    return [template.substitute(fields, desc=sender_role_desc or default_desc)
+            for template, default_desc in FALLBACK_TEMPLATES]
 
-Best,
-{sender_first_name}""",
-        
-        f"""Hi {prospect_name},
-The strategic thinking evident in your {prospect_role or 'professional'} work aligns with evolving business needs. As someone who {sender_role_desc or 'works on similar transformations'}, I believe we could have valuable conversations about future directions. Would appreciate connecting to exchange notes.
-
-Best,
-{sender_first_name}"""
-    ]
-    
-    return base_messages
 
 # ========== STREAMLIT APPLICATION ==========
 
@@ -571,6 +889,7 @@ modern_css = """
 
 .message-actions {
     display: flex;
+    flex-direction: column;
     gap: 10px;
     margin-top: auto;
 }
@@ -778,6 +1097,67 @@ modern_css = """
     ::-webkit-scrollbar-thumb:hover {
         background: linear-gradient(135deg, #00ffd0, #00b4d8);
     }
+
+    /* Message option cards (render_message_cards) */
+    .option-grid {
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        gap: 3rem;
+    }
+
+    .option-card {
+        height: 420px;
+        display: flex;
+        flex-direction: column;
+    }
+
+    .option-card-header {
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        margin-bottom: 15px;
+    }
+
+    .option-card-header h4 {
+        color: #00ffd0;
+        margin: 0;
+    }
+
+    .option-card-header span {
+        color: #8892b0;
+        font-size: 0.85rem;
+    }
+
+    .option-text {
+        flex-grow: 1;
+        overflow-y: auto;
+        margin-bottom: 20px;
+        white-space: pre-wrap;
+        word-wrap: break-word;
+        font-family: 'Inter', sans-serif;
+        line-height: 1.6;
+        color: #e6f7ff;
+        font-size: 0.95rem;
+    }
+
+    /* Getting Started steps */
+    .step-tile {
+        background: rgba(255, 255, 255, 0.03);
+        padding: 25px;
+        border-radius: 20px;
+        width: 200px;
+        border: 1px solid rgba(0, 180, 216, 0.1);
+    }
+
+    .step-tile h4 {
+        color: #e6f7ff;
+        margin-bottom: 10px;
+    }
+
+    .step-tile p {
+        color: #8892b0;
+        font-size: 0.9rem;
+    }
 </style>
 
 <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
@@ -785,6 +1165,60 @@ modern_css = """
 
 st.markdown(modern_css, unsafe_allow_html=True)
 
+LIVE_CLOCK_HTML = '''
+<p id="clock" style="color: #8892b0; font-size: 0.9rem; text-align: center; margin: 0; font-family: 'Inter', sans-serif;"></p>
+<script>
+const clock = document.getElementById("clock");
+const tick = () => { clock.textContent = new Date().toTimeString().slice(0, 8); };
+tick();
+setInterval(tick, 1000);
+</script>
+'''
+
+# Static empty-state panel shown until the sender's information is saved
+GETTING_STARTED_HTML = '''
+    <div style="text-align: center; padding: 80px 20px;">
+        <div style="position: relative; display: inline-block; margin-bottom: 40px;">
+            <div style="width: 120px; height: 120px; background: linear-gradient(135deg, #00b4d8, #00ffd0); border-radius: 30px; transform: rotate(45deg); margin: 0 auto 40px; position: relative; box-shadow: 0 20px 60px rgba(0, 180, 216, 0.4);">
+            </div>
+        </div>
+        <h2 style="color: #e6f7ff; margin-bottom: 20px; font-size: 2.5rem;">Get Started with LINZY</h2>
+        <p style="color: #8892b0; max-width: 600px; margin: 0 auto 50px; line-height: 1.8; font-size: 1.1rem;">
+            To generate personalized LinkedIn messages, please start by entering your information above.
+            Your "What You Do" will be used in the second line of every message.
+        </p>
+        <div style="display: flex; justify-content: center; gap: 30px; flex-wrap: wrap;">
+            <div class="step-tile">
+                <h4>1. Your Info</h4>
+                <p>Enter your name and what you do</p>
+            </div>
+            <div class="step-tile">
+                <h4>2. Prospect Profile</h4>
+                <p>Analyze the prospect LinkedIn profile</p>
+            </div>
+            <div class="step-tile">
+                <h4>3. Generate</h4>
+                <p>AI creates messages with role depth</p>
+            </div>
+        </div>
+    </div>
+    '''
+
+@lru_cache(maxsize=8)
+def render_sender_html(name: str, current_role: str, company: str, role_desc: str) -> str:
+    """Saved-sender card, built once per distinct sender instead of on every rerun."""
+    name, current_role, company, role_desc = map(html.escape, (name, current_role, company, role_desc))
+    return f"""
+    <div class="card-3d">
+        <div style="color: #e6f7ff;">
+            <div style="margin-bottom: 10px;"><strong>Name:</strong> {name}</div>
+            <div style="margin-bottom: 10px;"><strong>Role:</strong> {current_role}</div>
+            <div style="margin-bottom: 10px;"><strong>Company:</strong> {company}</div>
+            <div><strong>About You:</strong> {role_desc}</div>
+        </div>
+    </div>
+    """
+
 # --- Initialize Session State ---
 if 'profile_data' not in st.session_state:
     st.session_state.profile_data = None
@@ -804,6 +1238,12 @@ if 'message_instructions' not in st.session_state:
     st.session_state.message_instructions = ""
 if 'regenerate_mode' not in st.session_state:
     st.session_state.regenerate_mode = False
+if 'prospects' not in st.session_state:
+    st.session_state.prospects = {}
+if 'active_prospect' not in st.session_state:
+    st.session_state.active_prospect = None
+if 'pending_generation' not in st.session_state:
+    st.session_state.pending_generation = None
 
 # --- Main Container ---
 st.markdown('<div class="main-container">', unsafe_allow_html=True)
@@ -826,7 +1266,6 @@ with col2:
         <div style="color: #8892b0; font-size: 0.9rem;">
             <div>Sender: {sender_display}</div>
             <div>Messages: {len(st.session_state.generated_messages)}</div>
-            <div>{datetime.now().strftime("%H:%M:%S")}</div>
         </div>
     </div>
     ''', unsafe_allow_html=True)
@@ -869,401 +1308,538 @@ with col_s2:
         key="sender_company"
     )
 
+def save_sender_info():
+    """Store the sender form before the rerun, so the header above already shows the saved sender."""
+    if st.session_state.sender_name_input and st.session_state.sender_role_desc:
+        st.session_state.sender_info = {
+            'name': st.session_state.sender_name_input,
+            'role_desc': st.session_state.sender_role_desc,
+            'current_role': st.session_state.sender_current_role,
+            'company': st.session_state.sender_company
+        }
+
 col_save, col_clear = st.columns([1, 1])
 with col_save:
-    if st.button("Save Your Information", use_container_width=True):
+    if st.button("Save Your Information", use_container_width=True, on_click=save_sender_info):
         if sender_name_input and sender_role_desc:
-            st.session_state.sender_info = {
-                'name': sender_name_input,
-                'role_desc': sender_role_desc,
-                'current_role': sender_current_role,
-                'company': sender_company
-            }
             st.success("Information saved! Now analyze a prospect.")
-            st.rerun()
         else:
             st.warning("Please enter at least your Name and What You Do")
 
 with col_clear:
-    if st.button("Clear Information", use_container_width=True):
-        st.session_state.sender_info = {}
-        st.rerun()
+    st.button(
+        "Clear Information",
+        use_container_width=True,
+        on_click=lambda: st.session_state.update(sender_info={})
+    )
 
 # Display saved sender info
 if st.session_state.sender_info:
     with st.expander("Your Saved Information", expanded=False):
         info = st.session_state.sender_info
-        st.markdown(f"""
-        <div class="card-3d">
-            <div style="color: #e6f7ff;">
-                <div style="margin-bottom: 10px;"><strong>Name:</strong> {info.get('name', 'N/A')}</div>
-                <div style="margin-bottom: 10px;"><strong>Role:</strong> {info.get('current_role', 'N/A')}</div>
-                <div style="margin-bottom: 10px;"><strong>Company:</strong> {info.get('company', 'N/A')}</div>
-                <div><strong>About You:</strong> {info.get('role_desc', 'N/A')}</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(
+            render_sender_html(info.get('name', 'N/A'), info.get('current_role', 'N/A'), info.get('company', 'N/A'), info.get('role_desc', 'N/A')),
+            unsafe_allow_html=True
+        )
 
 # --- Prospect Analysis Section ---
 st.markdown("---")
 st.markdown('<h3 style="color: #e6f7ff; margin-bottom: 20px;">Prospect Analysis</h3>', unsafe_allow_html=True)
 
-prospect_col1, prospect_col2 = st.columns([3, 1])
+# A form, so editing the URLs doesn't rerun the app until Analyze is pressed
+with st.form("prospect_form", clear_on_submit=False, border=False):
+    prospect_col1, prospect_col2 = st.columns([3, 1])
 
-with prospect_col1:
-    prospect_linkedin_url = st.text_input(
-        "Prospect LinkedIn Profile URL",
-        placeholder="https://linkedin.com/in/prospectprofile",
-        key="prospect_url"
-    )
+    with prospect_col1:
+        prospect_linkedin_urls = st.text_area(
+            "Prospect LinkedIn Profile URLs (one per line)",
+            placeholder="https://linkedin.com/in/prospectprofile",
+            height=100,
+            key="prospect_urls"
+        )
 
-with prospect_col2:
-    st.markdown("<div style='height: 28px'></div>", unsafe_allow_html=True)
-    analyze_prospect_clicked = st.button(
-        "Analyze Prospect",
-        use_container_width=True,
-        key="analyze_prospect",
-        disabled=not st.session_state.sender_info or not prospect_linkedin_url
-    )
+    with prospect_col2:
+        st.markdown("<div style='height: 28px'></div>", unsafe_allow_html=True)
+        analyze_prospect_clicked = st.form_submit_button(
+            "Analyze Prospect",
+            use_container_width=True,
+            disabled=not st.session_state.sender_info
+        )
+
+prospect_urls = [url.strip() for url in prospect_linkedin_urls.splitlines() if url.strip()]
+
+if analyze_prospect_clicked and not prospect_urls:
+    st.warning("Enter at least one prospect LinkedIn URL.")
 
 if not st.session_state.sender_info:
     st.warning("Please set up your information first to generate personalized messages.")
 
+def activate_prospect(username: str):
+    """Make an analyzed prospect the one messages are generated for."""
+    profile_data = st.session_state.prospects[username]
+    st.session_state.active_prospect = username
+    st.session_state.profile_data = profile_data
+    st.session_state.processing_status = "Ready"
+
+    # Generated on demand from the Research Brief tab
+    st.session_state.research_brief = None
+    st.session_state.generated_messages = []
+    st.session_state.current_message_index = -1
+    # A generation still running belongs to the previous prospect
+    st.session_state.pending_generation = None
+
+SESSIONS_DIR = CACHE_DIR / "sessions"
+
+def _session_path(username: str) -> Path:
+    return SESSIONS_DIR / (re.sub(r"[^\w.-]", "_", username) + ".json")
+
+def save_session_snapshot():
+    """Write the active prospect's profile, brief and messages to disk so they survive a restart."""
+    username = st.session_state.active_prospect
+    if not username:
+        return
+    snapshot = {
+        "username": username,
+        "profile": st.session_state.profile_data,
+        "brief": st.session_state.research_brief,
+        "messages": st.session_state.generated_messages
+    }
+    try:
+        SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+        _session_path(username).write_text(json.dumps(snapshot, default=str), encoding="utf-8")
+    except OSError:
+        pass
+
+def restore_session_snapshot():
+    """Load the snapshot picked in the Restore Session selectbox, without re-scraping or regenerating."""
+    username = st.session_state.restore_session
+    if not username:
+        return
+    try:
+        snapshot = json.loads(_session_path(username).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        st.session_state.processing_status = "Error"
+        return
+    username = snapshot.get("username", username)
+    st.session_state.prospects[username] = snapshot["profile"]
+    st.session_state.active_prospect_select = username
+    st.session_state.active_prospect = username
+    st.session_state.profile_data = snapshot["profile"]
+    st.session_state.research_brief = snapshot["brief"]
+    st.session_state.generated_messages = snapshot["messages"]
+    st.session_state.current_message_index = -1
+    st.session_state.pending_generation = None
+    st.session_state.processing_status = "Ready"
+
 # Handle prospect analysis
-if analyze_prospect_clicked and prospect_linkedin_url and st.session_state.sender_info:
-    if not apify_api_key or not groq_api_key:
+if analyze_prospect_clicked and prospect_urls and st.session_state.sender_info:
+    if not get_keys().apify or not get_keys().groq:
         st.error("API configuration required.")
     else:
         st.session_state.processing_status = "Analyzing Prospect"
         
-        username = extract_username_from_url(prospect_linkedin_url)
-        run_info = start_apify_run(username, apify_api_key)
-        
-        if run_info:
-            # 1. Get main profile data
-            profile_data = poll_apify_run_with_status(
-                run_info["run_id"],
-                run_info["dataset_id"],
-                apify_api_key
-            )
+        usernames = list(dict.fromkeys(extract_username_from_url(url) for url in prospect_urls))
+
+        # One batched posts run for every prospect, scraped while the profile runs are in flight
+        posts_future = run_in_background(fetch_posts, tuple(usernames), get_keys().apify)
+
+        # 1. Get main profile data: the first prospect here, any others on the worker pool.
+        # Workers only return or raise; every spinner and error is drawn here on the script thread
+        profile_futures = {
+            username: run_in_background(fetch_profile, username, get_keys().apify)
+            for username in usernames[1:]
+        }
+        prospects = {}
+        with st.spinner("Analyzing prospect profiles..."):
+            for username in usernames:
+                try:
+                    if username in profile_futures:
+                        prospects[username] = profile_futures[username].result()
+                    else:
+                        prospects[username] = fetch_profile(username, get_keys().apify)
+                except FetchError as e:
+                    st.error(f"Failed to analyze prospect profile: {username} ({e})")
+
+        if prospects:
+            # 2. Collect recent posts (last 30 days only), scraped concurrently above
+            st.session_state.processing_status = "Scraping Recent Posts (30 days)"
+            try:
+                posts_by_username = posts_future.result()
+            except FetchError as e:
+                st.warning(f"Could not collect recent posts: {e}")
+                posts_by_username = {}
             
-            if profile_data:
-                # 2. Scrape recent posts (last 30 days only)
-                st.session_state.processing_status = "Scraping Recent Posts (30 days)"
-                raw_posts = scrape_linkedin_posts(prospect_linkedin_url, apify_api_key)
-                
-                # 3. Filter for professional content only
-                relevant_posts = filter_professional_posts(raw_posts)
-                
-                # Add filtered posts to profile data
-                profile_data['posts'] = relevant_posts
-                
-                # 4. Generate research brief
-                st.session_state.profile_data = profile_data
-                st.session_state.processing_status = "Generating Research"
-                
-                research_brief = generate_research_brief(profile_data, groq_api_key)
-                st.session_state.research_brief = research_brief
-                st.session_state.processing_status = "Ready"
-                
-                st.success("Prospect analysis complete!")
-                st.session_state.generated_messages = []
-                st.session_state.current_message_index = -1
-            else:
-                st.session_state.processing_status = "Error"
-                st.error("Failed to analyze prospect profile.")
+            # 3. Filter for professional content only and add to profile data
+            # Display dates are formatted once here rather than on every rerun of the Profile Data tab
+            for username, profile_data in prospects.items():
+                profile_data['posts'] = filter_professional_posts(posts_by_username.get(username, []))
+                for post in profile_data['posts']:
+                    post['display_date'] = format_post_date(post)
+            
+            # 4. Generate research brief for the first prospect
+            st.session_state.prospects = prospects
+            st.session_state.active_prospect_select = next(iter(prospects))
+            activate_prospect(st.session_state.active_prospect_select)
+            
+            st.success("Prospect analysis complete!")
+        else:
+            st.session_state.processing_status = "Error"
+            st.error("Failed to analyze prospect profile.")
+
+def prospect_label(username: str) -> str:
+    """Prospect's full name (top-level or under basic_info, depending on the actor), else the username."""
+    profile = st.session_state.prospects[username]
+    return profile.get('fullname') or (profile.get('basic_info') or {}).get('fullname') or username
+
+# Switch between prospects from a bulk analysis without re-scraping
+if len(st.session_state.prospects) > 1:
+    st.selectbox(
+        "Active Prospect",
+        options=list(st.session_state.prospects),
+        format_func=prospect_label,
+        key="active_prospect_select",
+        on_change=lambda: activate_prospect(st.session_state.active_prospect_select)
+    )
 
-# --- Results Display ---
-if st.session_state.profile_data and st.session_state.research_brief and st.session_state.sender_info:
-    st.markdown("---")
-    
-    tab1, tab2, tab3 = st.tabs([
-        "Message Generation", 
-        "Research Brief", 
-        "Profile Data"
-    ])
-    
-    with tab1:
-        st.markdown('<h3 style="color: #e6f7ff; margin-bottom: 25px;">Generate Message</h3>', unsafe_allow_html=True)
-
-        # Generation button
-        if st.button("Generate AI Messages", use_container_width=True, key="generate_message"):
-            with st.spinner("Creating personalized messages..."):
-                messages = analyze_and_generate_message(
-                    st.session_state.profile_data,
-                    st.session_state.sender_info,
-                    groq_api_key
-                )
+# Prospects analyzed in earlier sessions, saved once their brief or messages were generated
+saved_sessions = sorted(path.stem for path in SESSIONS_DIR.glob("*.json"))
+if saved_sessions:
+    st.selectbox(
+        "Restore Session",
+        options=saved_sessions,
+        index=None,
+        placeholder="Pick a previously analyzed prospect",
+        key="restore_session",
+        on_change=restore_session_snapshot
+    )
 
-                if messages:
-                    st.session_state.generated_messages = []
-                    for i, msg in enumerate(messages):
-                        st.session_state.generated_messages.append({
-                            "text": msg,
-                            "char_count": len(msg),
-                            "option": i + 1
-                        })
-                    st.rerun()
-
-        # Display all generated messages in separate columns
-        if len(st.session_state.generated_messages) > 0:
-            st.markdown("---")
-            st.markdown('<h4 style="color: #e6f7ff; margin-bottom: 20px;">Generated Message Options</h4>', unsafe_allow_html=True)
-
-            # Create 3 columns for the 3 messages
-            col1, col2, col3 = st.columns(3, gap="large")
-
-            columns = [col1, col2, col3]
-
-            for i, msg_data in enumerate(st.session_state.generated_messages[:3]):  # Only show first 3
-                with columns[i]:
-                    msg_text = msg_data["text"]
-                    char_count = msg_data["char_count"]
-
-                    # Message card
-                    st.markdown(f'''
-                    <div class="card-3d" style="height: 420px; display: flex; flex-direction: column;">
-                        <div style="margin-bottom: 15px;">
-                            <div style="display: flex; justify-content: space-between; align-items: center;">
-                                <h4 style="color: #00ffd0; margin: 0;">Option {msg_data['option']}</h4>
-                                <span style="color: #8892b0; font-size: 0.85rem;">
-                                    {char_count} chars
-                                </span>
-                            </div>
-                        </div>
-
-                        <div style="flex-grow: 1; overflow-y: auto; margin-bottom: 20px;">
-                            <pre style="white-space: pre-wrap; font-family: 'Inter', sans-serif; line-height: 1.6; margin: 0; color: #e6f7ff; font-size: 0.95rem; word-wrap: break-word;">
-{msg_text}
-                            </pre>
-                        </div>
-
-                        <div style="margin-top: auto;">
-                            <div style="display: flex; gap: 10px; margin-bottom: 10px;">
-                                <button onclick="navigator.clipboard.writeText(`{msg_text.replace('`', '\\`')}`)" style="background: rgba(0, 180, 216, 0.1); border: 1px solid rgba(0, 180, 216, 0.3); color: #00b4d8; padding: 8px 16px; border-radius: 8px; cursor: pointer; font-size: 0.9rem; width: 100%;">
-                                    <i class="fas fa-copy"></i> Copy
-                                </button>
-                            </div>
-                            <div style="text-align: center;">
-                                <button onclick="selectMessage({i})" style="background: linear-gradient(135deg, #00b4d8 0%, #0077b6 100%); color: white; border: none; padding: 10px; border-radius: 8px; cursor: pointer; font-size: 0.9rem; width: 100%;">
-                                    Select & Refine
-                                </button>
-                            </div>
-                        </div>
-                    </div>
-                    ''', unsafe_allow_html=True)
-
-            # Add JavaScript for copy and select functionality
-            st.markdown('''
-            <script>
-            function copyToClipboard(text) {
-                navigator.clipboard.writeText(text).then(() => {
-                    alert('Message copied to clipboard!');
-                });
-            }
+# One message card, styled by the .option-* classes in modern_css. No blank lines or indented
+# lines, so markdown keeps it a single HTML block; $text and $copy_js arrive already escaped
+MESSAGE_CARD_TEMPLATE = Template('''<div class="card-3d option-card">
+<div class="option-card-header">
+<h4>Option $option</h4>
+<span>$char_count chars</span>
+</div>
+<div class="option-text">$text</div>
+<div class="message-actions">
+<button class="btn-copy" onclick="navigator.clipboard.writeText($copy_js)"><i class="fas fa-copy"></i> Copy</button>
+<button class="btn-select" onclick="selectMessage($index)">Select &amp; Refine</button>
+</div>
+</div>''')
+
+def message_preview(text: str) -> str:
+    """One-line, 100-character preview for the history table, stored with each message."""
+    return text.replace('\n', ' ').strip()[:100] + "..." if len(text) > 100 else text
+
+def render_message_cards(messages: list) -> str:
+    """Side-by-side HTML for the message option cards."""
+    cards = "".join(
+        MESSAGE_CARD_TEMPLATE.substitute(
+            option=msg_data["option"],
+            char_count=len(msg_data["text"]),
+            # Newlines as entities: a blank line would end the markdown HTML block
+            text=html.escape(msg_data["text"]).replace("\n", "&#10;"),
+            # A JSON string literal is valid JS; escaping it again makes it safe inside the attribute
+            copy_js=html.escape(json.dumps(msg_data["text"])),
+            index=i
+        )
+        for i, msg_data in enumerate(messages)
+    )
+    return f'<div class="option-grid">{cards}</div>'
 
-            function selectMessage(index) {
-                // This would trigger a Streamlit rerun with the selected message index
-                // In a real implementation, you'd use Streamlit's JS to Python bridge
-                alert('Selected message ' + (index + 1) + ' for refinement');
-            }
-            </script>
-            ''', unsafe_allow_html=True)
+@st.fragment
+def render_message_history():
+    """
+    Every generated and refined version in one selectable table, with View/Use for the selected row.
+    A fragment, so selecting a row reruns only this expander and not the whole results page.
+    """
+    with st.expander("Message History (All Versions)", expanded=False):
+        history = [msg_obj for msg_obj in st.session_state.generated_messages if isinstance(msg_obj, dict)]
+        rows = []
+        for idx, msg_obj in enumerate(history):
+            refined_from = msg_obj.get("refined_from", "")
+            rows.append({
+                "Version": idx + 1,
+                "Refined From": f"Option {refined_from}" if refined_from else "",
+                # Stored when the message was added; computed here only for older snapshots
+                "Preview": msg_obj.get("preview") or message_preview(msg_obj.get("text", ""))
+            })
+
+        # One table element instead of a row of columns and buttons per version
+        selection = st.dataframe(
+            rows,
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="message_history_table"
+        )
 
-            # Refinement section
-            st.markdown("---")
-            st.markdown('<h4 style="color: #e6f7ff; margin-bottom: 20px;">Refine Selected Message</h4>', unsafe_allow_html=True)
+        selected_rows = selection.selection.rows
+        if selected_rows:
+            idx = selected_rows[0]
+            # Plain text box to read or copy from; no code-block highlighter for prose
+            st.text_area("Message text", history[idx].get("text", ""), height=160, key=f"view_text_{idx}", label_visibility="collapsed")
+            if st.button("Use This Version", key="use_hist", use_container_width=True):
+                st.info(f"Message {idx + 1} selected for use")
 
-            # Message selection dropdown
-            message_options = [f"Option {i+1}: {msg['text'][:80]}..." for i, msg in enumerate(st.session_state.generated_messages)]
+@st.fragment(run_every=0.5)
+def await_generated_messages():
+    """
+    Show progress for the background message generation and collect it when done.
+    Only this fragment reruns while waiting; the rest of the page stays interactive.
+    """
+    future = st.session_state.pending_generation
+    if not future.done():
+        st.info("Creating personalized messages...")
+        return
+
+    st.session_state.pending_generation = None
+    messages = future.result()
+    if messages:
+        st.session_state.generated_messages = [
+            {"text": msg, "preview": message_preview(msg), "option": i + 1}
+            for i, msg in enumerate(messages)
+        ]
+        save_session_snapshot()
+    st.rerun()
+
+@st.fragment
+def render_message_panel():
+    """
+    The Message Generation tab: options, refinement and history.
+    A fragment, so choosing an option, opening the refine form or cancelling reruns only this tab;
+    a new generation or refinement still reruns the whole app so the header's message count stays current.
+    """
+    st.markdown('<h3 style="color: #e6f7ff; margin-bottom: 25px;">Generate Message</h3>', unsafe_allow_html=True)
 
-            col_ref1, col_ref2 = st.columns([3, 1])
+    # Generation button: Groq runs on its own pool while await_generated_messages polls for it
+    if st.button("Generate AI Messages", use_container_width=True, key="generate_message",
+                 disabled=st.session_state.pending_generation is not None):
+        if not get_keys().groq:
+            st.error("Groq API key missing")
+        else:
+            st.session_state.pending_generation = run_in_background(
+                analyze_and_generate_message,
+                st.session_state.profile_data,
+                st.session_state.sender_info,
+                get_keys().groq,
+                executor=get_llm_executor()
+            )
 
-            with col_ref1:
-                selected_option = st.selectbox(
-                    "Select a message to refine:",
-                    options=range(len(st.session_state.generated_messages)),
-                    format_func=lambda x: message_options[x],
-                    key="selected_message_refine"
-                )
+    if st.session_state.pending_generation is not None:
+        await_generated_messages()
+
+    # One session-state lookup for the rest of the panel (it mutates this same list in place)
+    generated_messages = st.session_state.generated_messages
+
+    # Display all generated messages in separate columns
+    if generated_messages:
+        st.markdown("---")
+        st.markdown('<h4 style="color: #e6f7ff; margin-bottom: 20px;">Generated Message Options</h4>', unsafe_allow_html=True)
+
+        # All three cards go out in one markdown element
+        st.markdown(render_message_cards(generated_messages[:3]), unsafe_allow_html=True)
+
+        # Add JavaScript for copy and select functionality
+        st.markdown('''
+        <script>
+        function copyToClipboard(text) {
+            navigator.clipboard.writeText(text).then(() => {
+                alert('Message copied to clipboard!');
+            });
+        }
+
+        function selectMessage(index) {
+            // This would trigger a Streamlit rerun with the selected message index
+            // In a real implementation, you'd use Streamlit's JS to Python bridge
+            alert('Selected message ' + (index + 1) + ' for refinement');
+        }
+        </script>
+        ''', unsafe_allow_html=True)
+
+        # Refinement section
+        st.markdown("---")
+        st.markdown('<h4 style="color: #e6f7ff; margin-bottom: 20px;">Refine Selected Message</h4>', unsafe_allow_html=True)
+
+        # Message selection dropdown
+        message_options = [f"Option {i+1}: {msg['text'][:80]}..." for i, msg in enumerate(generated_messages)]
+
+        col_ref1, col_ref2 = st.columns([3, 1])
+
+        with col_ref1:
+            selected_option = st.selectbox(
+                "Select a message to refine:",
+                options=range(len(generated_messages)),
+                format_func=lambda x: message_options[x],
+                key="selected_message_refine"
+            )
+
+        with col_ref2:
+            refine_clicked = st.button("Refine This Message", use_container_width=True, key="refine_trigger")
 
-            with col_ref2:
-                refine_clicked = st.button("Refine This Message", use_container_width=True, key="refine_trigger")
+        # Refinement form
+        if refine_clicked or st.session_state.get('refine_mode', False):
+            st.session_state.refine_mode = True
 
-            # Refinement form
-            if refine_clicked or st.session_state.get('refine_mode', False):
-                st.session_state.refine_mode = True
+            selected_msg = generated_messages[selected_option]
 
-                selected_msg = st.session_state.generated_messages[selected_option]
+            with st.form("refinement_form"):
+                instructions = st.text_area(
+                    "How would you like to refine this message?",
+                    value=st.session_state.get('refine_instructions', ''),
+                    placeholder="Example: Make it more technical, focus on AI experience, make it shorter...",
+                    height=100,
+                    key="refine_instructions_input"
+                )
+
+                col_submit, col_cancel = st.columns([1, 1])
 
-                with st.form("refinement_form"):
-                    instructions = st.text_area(
-                        "How would you like to refine this message?",
-                        value=st.session_state.get('refine_instructions', ''),
-                        placeholder="Example: Make it more technical, focus on AI experience, make it shorter...",
-                        height=100,
-                        key="refine_instructions_input"
+                with col_submit:
+                    submit_refine = st.form_submit_button(
+                        "Generate Refined Version",
+                        use_container_width=True
                     )
 
-                    col_submit, col_cancel = st.columns([1, 1])
+                with col_cancel:
+                    st.form_submit_button(
+                        "Cancel",
+                        use_container_width=True,
+                        on_click=lambda: st.session_state.update(refine_mode=False)
+                    )
 
-                    with col_submit:
-                        submit_refine = st.form_submit_button(
-                            "Generate Refined Version",
-                            use_container_width=True
+                if submit_refine and instructions:
+                    with st.spinner("Refining message..."):
+                        refined_options = analyze_and_generate_message(
+                            st.session_state.profile_data,
+                            st.session_state.sender_info,
+                            get_keys().groq,
+                            instructions,
+                            selected_msg["text"]
                         )
 
-                    with col_cancel:
-                        cancel_refine = st.form_submit_button(
-                            "Cancel",
-                            use_container_width=True
-                        )
+                        if refined_options:
+                            # Add the refined message to the list
+                            new_msg = refined_options[0]
+                            generated_messages.append({
+                                "text": new_msg,
+                                "preview": message_preview(new_msg),
+                                "option": len(generated_messages) + 1,
+                                "refined_from": selected_option + 1
+                            })
+                            save_session_snapshot()
+                            st.session_state.refine_mode = False
+                            st.success("Message refined successfully!")
+                            st.rerun()
+                        else:
+                            st.error("Groq API key missing")
 
-                    if submit_refine and instructions:
-                        with st.spinner("Refining message..."):
-                            refined_options = analyze_and_generate_message(
-                                st.session_state.profile_data,
-                                st.session_state.sender_info,
-                                groq_api_key,
-                                instructions,
-                                selected_msg["text"]
-                            )
-
-                            if refined_options:
-                                # Add the refined message to the list
-                                new_msg = refined_options[0]
-                                st.session_state.generated_messages.append({
-                                    "text": new_msg,
-                                    "char_count": len(new_msg),
-                                    "option": len(st.session_state.generated_messages) + 1,
-                                    "refined_from": selected_option + 1
-                                })
-                                st.session_state.refine_mode = False
-                                st.success("Message refined successfully!")
-                                st.rerun()
-
-                    if cancel_refine:
-                        st.session_state.refine_mode = False
-                        st.rerun()
-
-            # Message history accordion
-            if len(st.session_state.generated_messages) > 3:
-                with st.expander("Message History (All Versions)", expanded=False):
-                    for idx, msg_obj in enumerate(st.session_state.generated_messages):
-                        if isinstance(msg_obj, dict):
-                            text = msg_obj.get("text", "")
-                            refined_from = msg_obj.get("refined_from", "")
-
-                            # Clean preview
-                            preview = text.replace('\n', ' ').strip()[:100] + "..." if len(text) > 100 else text
-
-                            col_hist1, col_hist2, col_hist3 = st.columns([3, 1, 1])
-
-                            with col_hist1:
-                                st.markdown(f"**Version {idx + 1}**" + (f" (Refined from Option {refined_from})" if refined_from else ""))
-                                st.markdown(f'<span style="color: #8892b0; font-size: 0.9rem;">{preview}</span>', unsafe_allow_html=True)
-
-                            with col_hist2:
-                                if st.button("View", key=f"view_hist_{idx}", use_container_width=True):
-                                    # You could implement a detailed view here
-                                    st.code(text, language=None)
-
-                            with col_hist3:
-                                if st.button("Use", key=f"use_hist_{idx}", use_container_width=True):
-                                    st.info(f"Message {idx + 1} selected for use")
-
-                            st.markdown("---")
+        # Message history accordion
+        if len(generated_messages) > 3:
+            render_message_history()
 
-        else:
-            # Empty state when no messages generated
-            st.markdown('''
-            <div class="card-3d" style="text-align: center; padding: 60px 30px;">
-                <div style="font-size: 4rem; margin-bottom: 20px; color: #00b4d8;">
-                    <i class="fas fa-comments"></i>
-                </div>
-                <h4 style="color: #e6f7ff; margin-bottom: 15px;">Generate Your First Messages</h4>
-                <p style="color: #8892b0; max-width: 500px; margin: 0 auto 30px;">
-                    Click the button above to generate 3 personalized LinkedIn message options. Each message will be displayed separately for easy comparison.
-                </p>
-                <div style="display: flex; justify-content: center; gap: 20px; margin-top: 40px;">
-                    <div style="text-align: center;">
-                        <div style="width: 60px; height: 60px; background: rgba(0, 180, 216, 0.1); border-radius: 15px; display: flex; align-items: center; justify-content: center; margin: 0 auto 10px;">
-                            <span style="color: #00b4d8; font-size: 1.5rem;">1</span>
-                        </div>
-                        <span style="color: #8892b0; font-size: 0.9rem;">Generate 3 Options</span>
+    else:
+        # Empty state when no messages generated
+        st.markdown('''
+        <div class="card-3d" style="text-align: center; padding: 60px 30px;">
+            <div style="font-size: 4rem; margin-bottom: 20px; color: #00b4d8;">
+                <i class="fas fa-comments"></i>
+            </div>
+            <h4 style="color: #e6f7ff; margin-bottom: 15px;">Generate Your First Messages</h4>
+            <p style="color: #8892b0; max-width: 500px; margin: 0 auto 30px;">
+                Click the button above to generate 3 personalized LinkedIn message options. Each message will be displayed separately for easy comparison.
+            </p>
+            <div style="display: flex; justify-content: center; gap: 20px; margin-top: 40px;">
+                <div style="text-align: center;">
+                    <div style="width: 60px; height: 60px; background: rgba(0, 180, 216, 0.1); border-radius: 15px; display: flex; align-items: center; justify-content: center; margin: 0 auto 10px;">
+                        <span style="color: #00b4d8; font-size: 1.5rem;">1</span>
                     </div>
-                    <div style="text-align: center;">
-                        <div style="width: 60px; height: 60px; background: rgba(0, 180, 216, 0.1); border-radius: 15px; display: flex; align-items: center; justify-content: center; margin: 0 auto 10px;">
-                            <span style="color: #00b4d8; font-size: 1.5rem;">2</span>
-                        </div>
-                        <span style="color: #8892b0; font-size: 0.9rem;">Compare & Select</span>
+                    <span style="color: #8892b0; font-size: 0.9rem;">Generate 3 Options</span>
+                </div>
+                <div style="text-align: center;">
+                    <div style="width: 60px; height: 60px; background: rgba(0, 180, 216, 0.1); border-radius: 15px; display: flex; align-items: center; justify-content: center; margin: 0 auto 10px;">
+                        <span style="color: #00b4d8; font-size: 1.5rem;">2</span>
                     </div>
-                    <div style="text-align: center;">
-                        <div style="width: 60px; height: 60px; background: rgba(0, 180, 216, 0.1); border-radius: 15px; display: flex; align-items: center; justify-content: center; margin: 0 auto 10px;">
-                            <span style="color: #00b4d8; font-size: 1.5rem;">3</span>
-                        </div>
-                        <span style="color: #8892b0; font-size: 0.9rem;">Refine & Copy</span>
+                    <span style="color: #8892b0; font-size: 0.9rem;">Compare & Select</span>
+                </div>
+                <div style="text-align: center;">
+                    <div style="width: 60px; height: 60px; background: rgba(0, 180, 216, 0.1); border-radius: 15px; display: flex; align-items: center; justify-content: center; margin: 0 auto 10px;">
+                        <span style="color: #00b4d8; font-size: 1.5rem;">3</span>
                     </div>
+                    <span style="color: #8892b0; font-size: 0.9rem;">Refine & Copy</span>
                 </div>
             </div>
-            ''', unsafe_allow_html=True)
-        
+        </div>
+        ''', unsafe_allow_html=True)
+
+@st.fragment
+def render_profile_data():
+    """The Profile Data tab; a fragment, so the raw-JSON toggle reruns only this tab."""
+    st.markdown('<h3 style="color: #e6f7ff; margin-bottom: 25px;">Profile Data</h3>', unsafe_allow_html=True)
+
+    # Display Recent Posts
+    st.markdown('<h4 style="color: #00ffd0;">Recent LinkedIn Posts (Last 30 Days)</h4>', unsafe_allow_html=True)
+    posts = st.session_state.profile_data.get('posts', [])
+
+    if posts:
+        # One table element for every post instead of an expander per post
+        st.dataframe(
+            [
+                {
+                    "date": post.get('display_date', 'Recent'),
+                    "text": post.get('text') or 'No text content',
+                    "url": post.get('url')
+                }
+                for post in posts
+            ],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "date": st.column_config.TextColumn("Date", width="small"),
+                "text": st.column_config.TextColumn("Content", width="large"),
+                "url": st.column_config.LinkColumn("URL", display_text="Open post")
+            }
+        )
+    else:
+        st.info("No professional posts found in the last 30 days.")
+
+    st.markdown("---")
+    # Only serialized and sent to the browser when asked for (an expander renders its body while collapsed)
+    if st.toggle("View Full Prospect Data", key="show_profile_json"):
+        st.code(json.dumps(st.session_state.profile_data, indent=2, ensure_ascii=False, default=str), language="json")
+
+# --- Results Display ---
+if st.session_state.profile_data and st.session_state.sender_info:
+    st.markdown("---")
+    
+    tab1, tab2, tab3 = st.tabs([
+        "Message Generation", 
+        "Research Brief", 
+        "Profile Data"
+    ])
+    
+    with tab1:
+        render_message_panel()
+
     with tab2:
         st.markdown('<h3 style="color: #e6f7ff; margin-bottom: 25px;">Research Brief</h3>', unsafe_allow_html=True)
         st.markdown('<div class="card-3d">', unsafe_allow_html=True)
-        st.markdown(st.session_state.research_brief)
+        if st.session_state.research_brief is not None:
+            st.markdown(st.session_state.research_brief)
+        elif st.button("Generate Research Brief", use_container_width=True, key="generate_brief"):
+            # Off the analysis path: only prospects the user actually researches pay for a brief
+            st.session_state.research_brief = st.write_stream(
+                generate_research_brief(st.session_state.profile_data, get_keys().groq)
+            )
+            save_session_snapshot()
         st.markdown('</div>', unsafe_allow_html=True)
     
     with tab3:
-        st.markdown('<h3 style="color: #e6f7ff; margin-bottom: 25px;">Profile Data</h3>', unsafe_allow_html=True)
-        
-        # Display Recent Posts
-        st.markdown('<h4 style="color: #00ffd0;">Recent LinkedIn Posts (Last 30 Days)</h4>', unsafe_allow_html=True)
-        posts = st.session_state.profile_data.get('posts', [])
-        
-        if posts:
-            for i, post in enumerate(posts):
-                with st.expander(f"Post {i+1} - {datetime.fromtimestamp(post.get('timestamp', 0)/1000).strftime('%Y-%m-%d') if post.get('timestamp') else 'Recent'}", expanded=(i==0)):
-                    st.markdown(f"**Content:**")
-                    st.write(post.get('text', 'No text content'))
-                    if post.get('url'):
-                        st.markdown(f"**URL:** {post.get('url')}")
-        else:
-            st.info("No professional posts found in the last 30 days.")
-        
-        st.markdown("---")
-        with st.expander("View Full Prospect Data", expanded=False):
-            st.json(st.session_state.profile_data)
+        render_profile_data()
 
 else:
     if not st.session_state.sender_info:
-        st.markdown('''
-        <div style="text-align: center; padding: 80px 20px;">
-            <div style="position: relative; display: inline-block; margin-bottom: 40px;">
-                <div style="width: 120px; height: 120px; background: linear-gradient(135deg, #00b4d8, #00ffd0); border-radius: 30px; transform: rotate(45deg); margin: 0 auto 40px; position: relative; box-shadow: 0 20px 60px rgba(0, 180, 216, 0.4);">
-                </div>
-            </div>
-            <h2 style="color: #e6f7ff; margin-bottom: 20px; font-size: 2.5rem;">Get Started with LINZY</h2>
-            <p style="color: #8892b0; max-width: 600px; margin: 0 auto 50px; line-height: 1.8; font-size: 1.1rem;">
-                To generate personalized LinkedIn messages, please start by entering your information above.
-                Your "What You Do" will be used in the second line of every message.
-            </p>
-            <div style="display: flex; justify-content: center; gap: 30px; flex-wrap: wrap;">
-                <div style="background: rgba(255, 255, 255, 0.03); padding: 25px; border-radius: 20px; width: 200px; border: 1px solid rgba(0, 180, 216, 0.1);">
-                    <h4 style="color: #e6f7ff; margin-bottom: 10px;">1. Your Info</h4>
-                    <p style="color: #8892b0; font-size: 0.9rem;">Enter your name and what you do</p>
-                </div>
-                <div style="background: rgba(255, 255, 255, 0.03); padding: 25px; border-radius: 20px; width: 200px; border: 1px solid rgba(0, 180, 216, 0.1);">
-                    <h4 style="color: #e6f7ff; margin-bottom: 10px;">2. Prospect Profile</h4>
-                    <p style="color: #8892b0; font-size: 0.9rem;">Analyze the prospect LinkedIn profile</p>
-                </div>
-                <div style="background: rgba(255, 255, 255, 0.03); padding: 25px; border-radius: 20px; width: 200px; border: 1px solid rgba(0, 180, 216, 0.1);">
-                    <h4 style="color: #e6f7ff; margin-bottom: 10px;">3. Generate</h4>
-                    <p style="color: #8892b0; font-size: 0.9rem;">AI creates messages with role depth</p>
-                </div>
-            </div>
-        </div>
-        ''', unsafe_allow_html=True)
+        st.markdown(GETTING_STARTED_HTML, unsafe_allow_html=True)
     else:
         st.info("Enter a prospect LinkedIn URL above and click Analyze Prospect to get started.")
 
@@ -1275,7 +1851,8 @@ col_f1, col_f2, col_f3 = st.columns(3)
 with col_f1:
     st.markdown('<p style="color: #8892b0; font-size: 0.9rem;">Linzy v3.0 | AI LinkedIn Messaging</p>', unsafe_allow_html=True)
 with col_f2:
-    st.markdown(f'<p style="color: #8892b0; font-size: 0.9rem; text-align: center;">{datetime.now().strftime("%H:%M:%S")}</p>', unsafe_allow_html=True)
+    # Ticks in the browser; the server never re-renders it
+    components.html(LIVE_CLOCK_HTML, height=30)
 with col_f3:
     if st.session_state.profile_data:
         name = "Prospect Loaded"